@@ -29,147 +29,447 @@ DEFAULT_SPEED_LIMIT_MPH = {
 }
 
 
+# distance (in miles) covered by one degree of latitude, used as a cheap lower bound on great circle distances
+# (scaled down very slightly so that rounding never makes the bound exceed the actual distance)
+MILES_PER_DEGREE_LAT = great_circle_distance((0, 0), (1, 0)) * (1 - 1e-9)
+
+
+class NodeRecord:
+    """
+    A node's location and what nodes it is connected to, while the auxiliary structures are being built
+    (w/ __slots__, so that each record is much smaller and faster to access than a dictionary)
+    """
+    __slots__ = ('lat', 'lon', 'connected')
+
+    def __init__(self):
+        self.lat = None
+        self.lon = None
+        self.connected = {}
+
+
+class SearchDirection:
+    """
+    The state of one direction of uniform_cost_search: the forward direction follows the edges from the start node,
+    and the backward direction follows them in reverse from the goal node
+    """
+    __slots__ = ('agenda', 'expanded', 'best_g', 'parent', 'edge_ptr', 'edge_nodes', 'edge_numbers', 'sign')
+
+    def __init__(self, source, num_nodes, edge_ptr, edge_nodes, edge_numbers, sign):
+        # "agenda" (a binary min-heap of paths to consider, ordered by their estimated costs)
+        # holds 4-element tuples w/ estimated cost, a counter (breaks ties in insertion order), terminal vertex, and cost
+        self.agenda = []
+        # "expanded" flags, lowest cost found so far for a path from (or to) the source node, and parent pointers toward
+        # the source node, which are all dense lists indexed by node number (so checking them is a plain index rather
+        # than a hash lookup)
+        self.expanded = bytearray(num_nodes)
+        self.best_g = [float('inf')] * num_nodes
+        self.best_g[source] = 0
+        self.parent = [None] * num_nodes
+        # the edges leaving (or leading to) node number i are numbered edge_numbers[edge_ptr[i]], ..., and lead
+        # to (or come from) edge_nodes[edge_ptr[i]], ...
+        self.edge_ptr = edge_ptr
+        self.edge_nodes = edge_nodes
+        self.edge_numbers = edge_numbers
+        # whether the potential is added to (1) or subtracted from (-1) the cost of a path in this direction
+        self.sign = sign
+
+
 def build_auxiliary_structures(nodes_filename, ways_filename):
     """
     Create any auxiliary structures you are interested in, by reading the data
     from the given filenames (using read_osm_data)
 
-    my structure - dictionary of nodes ids w/ their location, tags, and what nodes they are connected to by valid ways
-        also has a 'locations' section that has (lat, lon) as the keys w/ values being the node id of the node w/ that location
+    my structure - dictionary of nodes ids w/ a NodeRecord of their location and what nodes they are connected to by valid ways
     {
-        n1_id: {
+        n1_id: NodeRecord(
             lat: ( )
             lon: ( )
-            tags: {}
             connected: dict of node ids of places you can get to from here w/ the speed limit as the value
-        }
+        )
         ...
+    }
 
-        'locations'
-            (location tuples): node_id
-            ...
+    my structure is only used while reading the files, the returned structure numbers the nodes that have a location
+    0, 1, ..., N-1 (sorted by latitude, so the lists double as a simple spatial index for fast nearest node searches)
+    and stores the connections as compressed sparse row lists:
+    {
+        'ids': [node_id, ...] - node id of each node number
+        'index': {node_id: node number, ...}
+        'lats': [lat, ...] - lat of each node number
+        'lons': [lon, ...] - lon of each node number
+        'indptr': [0, ...] - the edges leaving node number i are the ones numbered indptr[i], ..., indptr[i+1]-1
+        'indices': [node number, ...] - node number each edge leads to
+        'speeds': [speed limit, ...] - speed limit of each edge
+        'edge_dist': [distance, ...] - great circle distance covered by each edge
+        'edge_time': [time, ...] - expected time to travel each edge (distance / speed limit)
+        'max_speed': highest speed limit of any edge
+        'rev_indptr', 'rev_indices', 'rev_edges': the same edges grouped by the node they lead to (for searching backward),
+            the edges leading to node number i are rev_edges[rev_indptr[i]], ..., rev_edges[rev_indptr[i+1]-1],
+            and rev_indices holds the node number each of them comes from
     }
     """
-    my_structure = {
-        'locations': {}
-    }
-    connected_nodes = set()
+    my_structure = {}
+    located_node_ids = []
     # loops over the ways in the file
     for way in read_osm_data(ways_filename):
-        # checks if they are a valid way
-        if 'highway' in way['tags'] and way['tags']['highway'] in ALLOWED_HIGHWAY_TYPES:
+        # checks if they are a valid way (looking up each tag only once)
+        tags = way['tags']
+        highway = tags.get('highway')
+        if highway in ALLOWED_HIGHWAY_TYPES:
             # if it is, gets the speed limit of the way
-            speed_limit = 0
-            if 'maxspeed_mph' in way['tags']:
-                speed_limit = way['tags']['maxspeed_mph']
-            else:
-                speed_limit = DEFAULT_SPEED_LIMIT_MPH[way['tags']['highway']]
+            speed_limit = tags.get('maxspeed_mph')
+            if speed_limit is None:
+                speed_limit = DEFAULT_SPEED_LIMIT_MPH[highway]
+            two_way = tags.get('oneway') != 'yes'
             # loops over the ways nodes (front to back), and for each node pair (A, B) adds B to A's connected section w/ the speed limit as the value
+            # (and if the road is two-way, also adds A to B's connected section in the same pass)
+            # (every node on a valid way gets an entry, even if nothing can be reached from it)
             prev_node_id = None
             for node in way['nodes']:
-                if prev_node_id:
-                    if prev_node_id in my_structure:
-                        my_structure[prev_node_id]['connected'][node] = speed_limit
-                    else:
-                        my_structure[prev_node_id] = {
-                            'connected': {
-                                node: speed_limit
-                            }
-                        }
-                connected_nodes.add(node)
+                if node not in my_structure:
+                    my_structure[node] = NodeRecord()
+                if prev_node_id is not None:
+                    my_structure[prev_node_id].connected[node] = speed_limit
+                    if two_way:
+                        my_structure[node].connected[prev_node_id] = speed_limit
                 prev_node_id = node
-            # if the road is two-way, it loops over the ways nodes in reverse (back to front), and for each node pair (B, A) adds A to B's connected section w/ the speed limit as the value
-            if not ('oneway' in way['tags'] and way['tags']['oneway'] == 'yes'):
-                # two way road
-                prev_node_id = None
-                for node in reversed(way['nodes']):
-                    if prev_node_id:
-                        if prev_node_id in my_structure:
-                            my_structure[prev_node_id]['connected'][node] = speed_limit
-                        else:
-                            my_structure[prev_node_id] = {
-                                'connected': {
-                                    node: speed_limit
-                                }
-                            }
-                    connected_nodes.add(node)
-                    prev_node_id = node
     # loops over all the nodes in the file
     for node in read_osm_data(nodes_filename):
-        # if the node is connected to something, then it adds its lat, lon, and tags information to the refactored structure
-        if node['id'] in connected_nodes:
-            if node['id'] in my_structure:
-                my_structure[node['id']].update({
-                    'lat': node['lat'],
-                    'lon': node['lon'],
-                    'tags': node['tags'].copy()
-                })
-            else:
-                my_structure[node['id']] = {
-                    'lat': node['lat'],
-                    'lon': node['lon'],
-                    'tags': node['tags'].copy(),
-                    'connected': {}
-                }
-            my_structure['locations'][(node['lat'], node['lon'])] = node['id']
-    return my_structure
+        # if the node is on a valid way (so it already has an entry), then it adds its lat and lon to the refactored structure
+        # (tags aren't stored, since nothing in the routing reads them)
+        entry = my_structure.get(node['id'])
+        if entry is not None:
+            entry.lat = node['lat']
+            entry.lon = node['lon']
+            located_node_ids.append(node['id'])
+    # numbers the nodes w/ a location in order of their location (nodes at the same location keep their order in the file)
+    ids = sorted(located_node_ids, key=lambda node_id: (my_structure[node_id].lat, my_structure[node_id].lon))
+    index = {node_id: i for i, node_id in enumerate(ids)}
+    # flattens each node's connections (to other nodes w/ a location) into the compressed sparse row lists
+    lats = [my_structure[node_id].lat for node_id in ids]
+    lons = [my_structure[node_id].lon for node_id in ids]
+    indptr = [0]
+    indices = []
+    speeds = []
+    edge_dist = []
+    for i, node_id in enumerate(ids):
+        loc = (lats[i], lons[i])
+        for other_node_id, speed_limit in my_structure[node_id].connected.items():
+            if other_node_id in index:
+                other = index[other_node_id]
+                indices.append(other)
+                speeds.append(speed_limit)
+                # computes each edge's distance once here, so that searches never need to
+                # (the reverse edge of a two-way road has already been added if the other node is numbered lower,
+                # in which case its distance is shared rather than computed and stored a second time)
+                dist = None
+                if other < i:
+                    for reverse_edge in range(indptr[other], indptr[other + 1]):
+                        if indices[reverse_edge] == i:
+                            dist = edge_dist[reverse_edge]
+                            break
+                if dist is None:
+                    dist = great_circle_distance(loc, (lats[other], lons[other]))
+                edge_dist.append(dist)
+        indptr.append(len(indices))
+    edge_time = [dist / speed_limit for dist, speed_limit in zip(edge_dist, speeds)]
+    # groups the edges by the node they lead to (counting how many lead to each node, then filling in each node's slots)
+    rev_indptr = [0] * (len(ids) + 1)
+    for other in indices:
+        rev_indptr[other + 1] += 1
+    for i in range(len(ids)):
+        rev_indptr[i + 1] += rev_indptr[i]
+    rev_indices = [None] * len(indices)
+    rev_edges = [None] * len(indices)
+    next_slot = rev_indptr[:-1]
+    for i in range(len(ids)):
+        for edge in range(indptr[i], indptr[i + 1]):
+            slot = next_slot[indices[edge]]
+            rev_indices[slot] = i
+            rev_edges[slot] = edge
+            next_slot[indices[edge]] += 1
+    return {
+        'ids': ids,
+        'index': index,
+        'lats': lats,
+        'lons': lons,
+        'indptr': indptr,
+        'indices': indices,
+        'speeds': speeds,
+        'edge_dist': edge_dist,
+        'edge_time': edge_time,
+        'max_speed': max(speeds, default=1),
+        'rev_indptr': rev_indptr,
+        'rev_indices': rev_indices,
+        'rev_edges': rev_edges,
+    }
 
 def get_lat_lon(node_id, aux_structures):
     """ Helper function
     Returns a 2-element tuples with the lat and lon of the node with the inputed node_id
     """
-    if node_id in aux_structures:
-        return (aux_structures[node_id]['lat'], aux_structures[node_id]['lon'])
+    if node_id in aux_structures['index']:
+        i = aux_structures['index'][node_id]
+        return (aux_structures['lats'][i], aux_structures['lons'][i])
     return None
 
-def uniform_cost_search(start, goal, neighbors, cost, aux_structures, heuristic=False):
-    # Initialize an "agenda" (containing paths to consider, as well as their costs).
-    agenda = [([ start ], 0)] # holds 2-element tuple w/ path and cost
-    # Intialize empty "expanded" set (set of vertices we've ever removed from the agenda)
-    expanded_set = set()
-    # num_of_paths_popped = 0 # used to track the difference in pops w/ and w/o heuristic
-    while agenda:
-        path = None
-        min_cost = None
-        min_index = 0
+def heap_push(heap, item):
+    """ Helper function
+    Adds item to the binary min-heap stored in the list heap
+    """
+    heap.append(item)
+    index = len(heap) - 1
+    # moves the item up the heap while it is smaller than its parent
+    while index > 0:
+        parent = (index - 1) // 2
+        if not item < heap[parent]:
+            break
+        heap[index] = heap[parent]
+        index = parent
+    heap[index] = item
+
+def heap_pop(heap):
+    """ Helper function
+    Removes and returns the smallest item of the binary min-heap stored in the list heap
+    """
+    smallest = heap[0]
+    item = heap.pop()
+    size = len(heap)
+    if size:
+        # moves the last item down from the root while one of its children is smaller than it
         index = 0
-        # Remove the path with the lowest cost from the agenda.
-        for path_and_cost in agenda:
-            if path_and_cost:
-                if heuristic:
-                    g = path_and_cost[1] # path cost from the starting node to node n
-                    h = great_circle_distance(get_lat_lon(path_and_cost[0][-1], aux_structures), get_lat_lon(goal, aux_structures)) # estimated cost of the lowest-cost path from node n to the goal node
-                    f = g + h # estimated cost of the lowest-cost solution involving n
-                    if min_cost == None or f < min_cost:
-                        min_cost = f
-                        min_index = index
-                else:
-                    if min_cost == None or path_and_cost[1] < min_cost:
-                        min_cost = path_and_cost[1]
-                        min_index = index
-            index += 1
-        # num_of_paths_popped += 1
-        path = agenda[min_index]
-        del agenda[min_index]
-        # If this path's terminal vertex is in the expanded set, ignore it completely and move on to the next path.
-        terminal_vertex = path[0][-1]
-        if terminal_vertex in expanded_set:
+        child = 1
+        while child < size:
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if not heap[child] < item:
+                break
+            heap[index] = heap[child]
+            index = child
+            child = 2 * index + 1
+        heap[index] = item
+    return smallest
+
+def find_all_costs(aux_structures, source, edge_cost, backward=False):
+    """ Helper function
+    Returns a list of the lowest cost of a path from node number source to each node number (or from each node number
+    to source if backward is True), w/ float('inf') for the nodes that have no such path
+    """
+    if backward:
+        edge_ptr = aux_structures['rev_indptr']
+        edge_nodes = aux_structures['rev_indices']
+        edge_numbers = aux_structures['rev_edges']
+    else:
+        edge_ptr = aux_structures['indptr']
+        edge_nodes = aux_structures['indices']
+        edge_numbers = range(len(edge_cost))
+    costs = [float('inf')] * len(aux_structures['ids'])
+    costs[source] = 0
+    # agenda holds 2-element tuples w/ cost and node number (a node's stale entries have a higher cost than its best one)
+    agenda = [(0, source)]
+    while agenda:
+        g, node = heap_pop(agenda)
+        if g > costs[node]:
             continue
-        # If this path's terminal vertex satisfies the goal condition, return that path (hooray!). Otherwise, add its terminal vertex to the expanded set.
-        if terminal_vertex == goal:
-            # print(num_of_paths_popped)
-            return path[0]
-        expanded_set.add(terminal_vertex)
-        # For each of the children of that path's terminal vertex:
-        for n in neighbors(terminal_vertex):
-            # If it is in the expanded set, skip it
-            if not n in expanded_set:
-                c = cost(terminal_vertex, n)
+        for i in range(edge_ptr[node], edge_ptr[node + 1]):
+            n = edge_nodes[i]
+            child_g = g + edge_cost[edge_numbers[i]]
+            if child_g < costs[n]:
+                costs[n] = child_g
+                heap_push(agenda, (child_g, n))
+    return costs
+
+def build_landmarks(aux_structures, count=8):
+    """
+    Precompute landmarks for A* w/ landmarks (ALT), which is worthwhile when many paths are found w/ the same
+    auxiliary structures (it takes 4 full searches per landmark, so it isn't done by build_auxiliary_structures)
+
+    picks count landmarks spread far apart, and adds the lowest cost of a path from each landmark to every node and from
+    every node to each landmark to aux_structures (in terms of distance and of expected time), which distance_heuristic
+    and time_heuristic then use for much tighter lower bounds than the great circle distance alone
+    the costs are grouped into one tuple per node number (float('inf') where there is no path), w/ the costs to the
+    landmarks negated, so that every landmark bound is the same subtraction and a bound only looks up two tuples
+    {
+        'dist_landmarks': [
+            (cost from each landmark to node number, ..., -cost from node number to each landmark, ...),
+            ...
+        ]
+        'time_landmarks': [ same, in terms of expected time ]
+    }
+    """
+    lats = aux_structures['lats']
+    lons = aux_structures['lons']
+    num_nodes = len(aux_structures['ids'])
+    if not num_nodes:
+        return
+    # starts from the southernmost node, then repeatedly picks the node farthest from all the landmarks so far
+    landmarks = [0]
+    closest_dist = [great_circle_distance((lats[0], lons[0]), (lats[i], lons[i])) for i in range(num_nodes)]
+    while len(landmarks) < min(count, num_nodes):
+        farthest = max(range(num_nodes), key=closest_dist.__getitem__)
+        landmarks.append(farthest)
+        farthest_loc = (lats[farthest], lons[farthest])
+        for i in range(num_nodes):
+            dist = great_circle_distance(farthest_loc, (lats[i], lons[i]))
+            if dist < closest_dist[i]:
+                closest_dist[i] = dist
+    for key, edge_cost in (('dist_landmarks', aux_structures['edge_dist']), ('time_landmarks', aux_structures['edge_time'])):
+        from_landmark_costs = [find_all_costs(aux_structures, landmark, edge_cost) for landmark in landmarks]
+        to_landmark_costs = [find_all_costs(aux_structures, landmark, edge_cost, True) for landmark in landmarks]
+        aux_structures[key] = list(zip(*from_landmark_costs, *([-cost for cost in costs] for costs in to_landmark_costs)))
+
+def landmark_heuristic(landmarks, node1, node2):
+    """ Helper function
+    Returns a lower bound on the cost of any path from node number node1 to node number node2, using the triangle
+    inequality w/ each landmark (landmarks being one of the lists of cost tuples added by build_landmarks)
+
+    a path from a landmark to node2 is no longer than the one to node1 plus the one from node1 to node2, and a path from
+    node1 to a landmark is no longer than the one from node1 to node2 plus the one from node2 (w/ the costs to the
+    landmarks negated, both bounds are cost2 - cost1)
+    where a landmark can't reach one of the nodes, the difference is either nan, which never compares greater and so is
+    skipped, or inf, which only happens when there really is no path from node1 to node2
+    """
+    bound = 0
+    for cost1, cost2 in zip(landmarks[node1], landmarks[node2]):
+        if cost2 - cost1 > bound:
+            bound = cost2 - cost1
+    return bound
+
+def distance_heuristic(aux_structures, node1, node2):
+    """ Helper function
+    Returns a lower bound on the distance of any path between the two node numbers (the landmark bound if
+    build_landmarks has been run, otherwise the great circle distance)
+    (the landmark bound is nearly always the tighter one on road maps, so the great circle distance isn't also
+    computed, which keeps each estimate cheap enough for the landmarks to pay off)
+    """
+    if 'dist_landmarks' in aux_structures:
+        return landmark_heuristic(aux_structures['dist_landmarks'], node1, node2)
+    lats = aux_structures['lats']
+    lons = aux_structures['lons']
+    return great_circle_distance((lats[node1], lons[node1]), (lats[node2], lons[node2]))
+
+def time_heuristic(aux_structures, node1, node2):
+    """ Helper function
+    Returns a lower bound on the expected time of any path between the two node numbers (the great circle distance
+    travelled at the highest speed limit in the graph, or the landmark bound if build_landmarks has been run and it is larger)
+    """
+    lats = aux_structures['lats']
+    lons = aux_structures['lons']
+    bound = great_circle_distance((lats[node1], lons[node1]), (lats[node2], lons[node2])) / aux_structures['max_speed']
+    if 'time_landmarks' in aux_structures:
+        bound = max(bound, landmark_heuristic(aux_structures['time_landmarks'], node1, node2))
+    return bound
+
+def uniform_cost_search(start, goal, aux_structures, heuristic=None, by_time=False):
+    """ Helper function
+    Returns a list of node ids of the lowest-cost path from the start node to the goal node (or None if there isn't one),
+    where the cost of an edge is its distance, or its expected time if by_time is True
+
+    heuristic(aux_structures, node1, node2) (if given) must never overestimate the cost of a path between two node
+    numbers (and must be consistent), and turns the search into A*
+
+    searches forward from the start node and backward from the goal node at the same time (one path off each agenda
+    in turn), which expands far fewer paths than searching from the start node alone
+    """
+    index = aux_structures['index']
+    if start not in index or goal not in index:
+        return None
+    # binds everything used in the loop below to local variables, and looks up the edge costs inline (instead of
+    # through per-edge function calls), since this loop is where nearly all of the time is spent
+    ids = aux_structures['ids']
+    edge_cost = aux_structures['edge_time'] if by_time else aux_structures['edge_dist']
+    push = heap_push
+    pop = heap_pop
+    inf = float('inf')
+    # the search itself works w/ node numbers
+    start = index[start]
+    goal = index[goal]
+    if start == goal:
+        return [ids[start]]
+    # the paths on both agendas are ordered by cost plus a potential: half of the estimated cost from node n to the goal
+    # node minus the estimated cost from the start node to node n (forward) or its negation (backward), which keeps
+    # both searches consistent w/ each other (the potentials are cached, since each one takes two estimates)
+    potential_cache = {}
+    def potential(n):
+        if heuristic is None:
+            return 0
+        if n not in potential_cache:
+            potential_cache[n] = (heuristic(aux_structures, n, goal) - heuristic(aux_structures, start, n)) / 2
+        return potential_cache[n]
+    # Initialize each direction w/ its own agenda, expanded flags, best costs, and parent pointers toward its own
+    # starting node (the paths are only rebuilt once the searches are done)
+    forward = SearchDirection(
+        start, len(ids), aux_structures['indptr'], aux_structures['indices'], range(len(edge_cost)), 1,
+    )
+    backward = SearchDirection(
+        goal, len(ids), aux_structures['rev_indptr'], aux_structures['rev_indices'], aux_structures['rev_edges'], -1,
+    )
+    push(forward.agenda, (potential(start), 0, start, 0))
+    push(backward.agenda, (-potential(goal), 1, goal, 0))
+    counter = 2
+    # cost of the lowest-cost path found so far, and the node where its forward and backward halves meet
+    best_cost = inf
+    meeting_node = None
+    # num_of_paths_popped = 0 # used to track the difference in pops w/ and w/o heuristic
+    this, other = forward, backward
+    while this.agenda and other.agenda:
+        # once the lowest estimated costs left on the two agendas add up to at least the cost of the lowest-cost path
+        # found so far, no pair of remaining paths could make a lower-cost one, so that path is the lowest-cost path
+        if this.agenda[0][0] + other.agenda[0][0] >= best_cost:
+            break
+        agenda = this.agenda
+        expanded = this.expanded
+        best_g = this.best_g
+        parent = this.parent
+        edge_ptr = this.edge_ptr
+        edge_nodes = this.edge_nodes
+        edge_numbers = this.edge_numbers
+        sign = this.sign
+        other_best_g = other.best_g
+        # Remove the path with the lowest (estimated) cost from this direction's agenda.
+        # num_of_paths_popped += 1
+        _, _, terminal_vertex, g = pop(agenda)
+        # If this path's terminal vertex has been expanded, ignore it. Otherwise, mark its terminal vertex as expanded.
+        if not expanded[terminal_vertex]:
+            expanded[terminal_vertex] = 1
+            # For each of the children of that path's terminal vertex (in this direction):
+            for i in range(edge_ptr[terminal_vertex], edge_ptr[terminal_vertex + 1]):
+                n = edge_nodes[i]
+                # If it has been expanded, skip it
+                if expanded[n]:
+                    continue
+                c = edge_cost[edge_numbers[i]]
                 if c:
+                    child_g = g + c # path cost from this direction's starting node to node n
+                    # If it doesn't improve on the best path found to node n so far, skip it
+                    if child_g >= best_g[n]:
+                        continue
+                    best_g[n] = child_g
+                    parent[n] = terminal_vertex
                     # Otherwise, add the associated path (and cost) to the agenda
-                    agenda.append((path[0] + [n], path[1] + c))
-        # until the agenda is empty (search failed)
-    return None
+                    push(agenda, (child_g + sign * potential(n), counter, n, child_g))
+                    counter += 1
+                    # if the other direction has reached node n too (its cost isn't inf), joining the two gives a path from the start node to the goal node
+                    if child_g + other_best_g[n] < best_cost:
+                        best_cost = child_g + other_best_g[n]
+                        meeting_node = n
+        this, other = other, this
+        # until either agenda is empty
+    # print(num_of_paths_popped)
+    if meeting_node is None:
+        return None
+    # walks the forward parent pointers back to the start node, then the backward ones on to the goal node, to rebuild the path (of node ids)
+    path = []
+    node = meeting_node
+    while node is not None:
+        path.append(ids[node])
+        node = forward.parent[node]
+    path.reverse()
+    node = backward.parent[meeting_node]
+    while node is not None:
+        path.append(ids[node])
+        node = backward.parent[node]
+    return path
 
 def find_short_path_nodes(aux_structures, node1, node2):
     """
@@ -186,30 +486,67 @@ def find_short_path_nodes(aux_structures, node1, node2):
     """
     if node1 == node2:
         return [node1]
-    def neighbors(node_id):
-        if aux_structures[node_id]['connected'].keys():
-            return aux_structures[node_id]['connected'].keys()
-        return []
-    def cost(node_id_1, node_id_2):
-        loc1 = get_lat_lon(node_id_1, aux_structures)
-        loc2 = get_lat_lon(node_id_2, aux_structures)
-        if loc1 and loc2:
-            return great_circle_distance(loc1, loc2)
-        return None
-    return uniform_cost_search(node1, node2, neighbors, cost, aux_structures, True)
+    return uniform_cost_search(node1, node2, aux_structures, distance_heuristic)
+
+def nearest_node_number(loc, aux_structures, guess=None):
+    """ Helper function
+    Returns the number of the closest node to this location (or None if there are no nodes), where guess (if given) is
+    the number of a node that is likely to be close, which lets the scan below stop sooner
+    """
+    lat = loc[0]
+    lats = aux_structures['lats']
+    lons = aux_structures['lons']
+    # binary searches the (sorted) latitudes for the first node at or above this location's latitude
+    low = 0
+    high = len(lats)
+    while low < high:
+        mid = (low + high) // 2
+        if lats[mid] < lat:
+            low = mid + 1
+        else:
+            high = mid
+    min_dist = None
+    min_i = None
+    if guess is not None:
+        min_dist = great_circle_distance(loc, (lats[guess], lons[guess]))
+        min_i = guess
+    # scans outward from there (north, then south), stopping in each direction once the difference in latitude alone
+    # is already farther than the closest node so far
+    for indices in (range(low, len(lats)), range(low - 1, -1, -1)):
+        for i in indices:
+            if min_dist != None and abs(lats[i] - lat) * MILES_PER_DEGREE_LAT > min_dist:
+                break
+            dist = great_circle_distance(loc, (lats[i], lons[i]))
+            # (if several nodes share the closest location, the last one in the file is used)
+            if min_dist == None or min_dist > dist or (min_dist == dist and i > min_i):
+                min_dist = dist
+                min_i = i
+    return min_i
 
 def get_nearest_node_id(loc, aux_structures):
     """ helper function 
     Returns the id of closest node to this location 
     """
-    min_dist = None
-    min_node_id = None
-    for l in aux_structures['locations']:
-        dist = great_circle_distance(loc, l)
-        if min_dist == None or min_dist > dist:
-            min_dist = dist
-            min_node_id = aux_structures['locations'][l]
-    return min_node_id
+    i = nearest_node_number(loc, aux_structures)
+    if i == None:
+        return None
+    return aux_structures['ids'][i]
+
+def get_nearest_node_ids(locs, aux_structures):
+    """ helper function
+    Returns a list of the ids of the closest nodes to each of these locations
+
+    handles the locations in order of latitude, starting each scan from the closest node to the previous location
+    (so for locations near each other, most of the nodes they would have to consider are skipped right away)
+    """
+    ids = aux_structures['ids']
+    nearest_ids = [None] * len(locs)
+    guess = None
+    for j in sorted(range(len(locs)), key=lambda j: locs[j][0]):
+        guess = nearest_node_number(locs[j], aux_structures, guess)
+        if guess != None:
+            nearest_ids[j] = ids[guess]
+    return nearest_ids
 
 def convert_nodes_path_to_loc_path(nodes_path, aux_structures):
     """ helper function
@@ -218,7 +555,7 @@ def convert_nodes_path_to_loc_path(nodes_path, aux_structures):
     if nodes_path:
         loc_path = []
         for node_id in nodes_path:
-            loc_path.append((aux_structures[node_id]['lat'], aux_structures[node_id]['lon']))
+            loc_path.append(get_lat_lon(node_id, aux_structures))
         return loc_path
     return None
 
@@ -237,23 +574,12 @@ def find_short_path(aux_structures, loc1, loc2):
         a list of (latitude, longitude) tuples representing the shortest path
         (in terms of distance) from loc1 to loc2.
     """
-    n1 = get_nearest_node_id(loc1, aux_structures)
-    n2 = get_nearest_node_id(loc2, aux_structures)
+    n1, n2 = get_nearest_node_ids([loc1, loc2], aux_structures)
     if not n1 or not n2:
         return None
     if n1 == n2:
-        return [(aux_structures[n1]['lat'], aux_structures[n1]['lon'])]
-    def neighbors(node_id):
-        if aux_structures[node_id]['connected'].keys():
-            return aux_structures[node_id]['connected'].keys()
-        return []
-    def cost(node_id_1, node_id_2):
-        loc1 = get_lat_lon(node_id_1, aux_structures)
-        loc2 = get_lat_lon(node_id_2, aux_structures)
-        if loc1 and loc2:
-            return great_circle_distance(loc1, loc2)
-        return None
-    nodes_path = uniform_cost_search(n1, n2, neighbors, cost, aux_structures, True)
+        return [get_lat_lon(n1, aux_structures)]
+    nodes_path = uniform_cost_search(n1, n2, aux_structures, distance_heuristic)
     return convert_nodes_path_to_loc_path(nodes_path, aux_structures)
 
 
@@ -273,33 +599,25 @@ def find_fast_path(aux_structures, loc1, loc2):
         a list of (latitude, longitude) tuples representing the shortest path
         (in terms of time) from loc1 to loc2.
     """
-    n1 = get_nearest_node_id(loc1, aux_structures)
-    n2 = get_nearest_node_id(loc2, aux_structures)
+    n1, n2 = get_nearest_node_ids([loc1, loc2], aux_structures)
     if not n1 or not n2:
         return None
     if n1 == n2:
-        return [(aux_structures[n1]['lat'], aux_structures[n1]['lon'])]
-    def neighbors(node_id):
-        if aux_structures[node_id]['connected'].keys():
-            return aux_structures[node_id]['connected'].keys()
-        return []
-    def cost(node_id_1, node_id_2):
-        loc1 = get_lat_lon(node_id_1, aux_structures)
-        loc2 = get_lat_lon(node_id_2, aux_structures)
-        speed_limit = aux_structures[node_id_1]['connected'][node_id_2]
-        if loc1 and loc2:
-            return great_circle_distance(loc1, loc2) / speed_limit
-        return None
-    nodes_path = uniform_cost_search(n1, n2, neighbors, cost, aux_structures, False)
+        return [get_lat_lon(n1, aux_structures)]
+    nodes_path = uniform_cost_search(n1, n2, aux_structures, time_heuristic, True)
     return convert_nodes_path_to_loc_path(nodes_path, aux_structures)
 
+# nodes of each dataset read by get_node_by_id so far, keyed by dataset name and then by node id
+NODES_BY_DATASET = {}
+
 def get_node_by_id(node_id, dataset_name):
     """ Helper function 
     Returns node with the node id in the dataset
+    (the dataset's nodes file is only read the first time, after that the node is looked up in NODES_BY_DATASET)
     """
-    for node in read_osm_data('resources/' + dataset_name + '.nodes'):
-        if node['id'] == node_id:
-            return node
+    if dataset_name not in NODES_BY_DATASET:
+        NODES_BY_DATASET[dataset_name] = {node['id']: node for node in read_osm_data('resources/' + dataset_name + '.nodes')}
+    return NODES_BY_DATASET[dataset_name].get(node_id)
 
 if __name__ == '__main__':
     # additional code here will be run only when lab.py is invoked directly
@@ -266,6 +266,57 @@ def test_cambridge_fast(testcase):
     compare_output('cambridge', inps, ix, 'fast')
 
 
+def test_midwest_nearest_node_ids():
+    # Looking up many locations at once should give the same nodes as looking
+    # each one up on its own (including locations exactly on nodes, repeated
+    # locations, and locations between nodes)
+    aux = load_dataset('midwest')
+    node_ids = aux['ids'][::250]
+    node_locs = [lab.get_lat_lon(node_id, aux) for node_id in node_ids]
+    assert lab.get_nearest_node_ids(node_locs, aux) == node_ids
+    min_lat, max_lat = aux['lats'][0], aux['lats'][-1]
+    min_lon, max_lon = min(aux['lons']), max(aux['lons'])
+    grid_locs = [
+        (min_lat + (max_lat - min_lat) * i / 19, min_lon + (max_lon - min_lon) * j / 19)
+        for i in range(20) for j in range(20)
+    ]
+    test_locs = [loc for inps in MIDWEST_TESTS for loc in inps]
+    locs = node_locs + node_locs[::-1] + grid_locs + test_locs
+    expected = [lab.get_nearest_node_id(loc, aux) for loc in locs]
+    assert lab.get_nearest_node_ids(locs, aux) == expected
+    assert lab.get_nearest_node_ids([], aux) == []
+
+    # midwest has no nodes at the same location, so this copies some nodes to
+    # share a location w/ the node before them (the later node in the file is
+    # the one that should be used)
+    shared = dict(aux)
+    shared['ids'] = list(aux['ids'])
+    shared['lats'] = list(aux['lats'])
+    shared['lons'] = list(aux['lons'])
+    for i in range(len(aux['ids']) - 1, 0, -500):
+        shared['ids'].insert(i + 1, -i)
+        shared['lats'].insert(i + 1, shared['lats'][i])
+        shared['lons'].insert(i + 1, shared['lons'][i])
+    shared_locs = [(shared['lats'][i], shared['lons'][i]) for i in range(len(shared['ids'])) if shared['ids'][i] < 0]
+    locs = shared_locs + shared_locs[::-1] + grid_locs
+    expected = [lab.get_nearest_node_id(loc, shared) for loc in locs]
+    assert expected[:len(shared_locs)] == [-i for i in range(len(aux['ids']) - 1, 0, -500)][::-1]
+    assert lab.get_nearest_node_ids(locs, shared) == expected
+
+
+@pytest.mark.parametrize('type_', ['short', 'fast'])
+def test_midwest_landmarks(type_):
+    # Landmarks only tighten the heuristics, so the same paths should be found
+    nodes_name = os.path.join(TEST_DIRECTORY, 'resources', 'midwest.nodes')
+    ways_name = os.path.join(TEST_DIRECTORY, 'resources', 'midwest.ways')
+    aux = lab.build_auxiliary_structures(nodes_name, ways_name)
+    lab.build_landmarks(aux)
+    for ix, inps in enumerate(MIDWEST_TESTS):
+        with open(f'test_data/test_midwest_{ix:02d}_{type_}.pickle', 'rb') as f:
+            expected_path = pickle.load(f)
+        compare_result_expected(aux, inps, expected_path, type_)
+
+
 if __name__ == '__main__':
     import sys
     import json